@@ -13,15 +13,40 @@ Description:
 
 import argparse
 import os
-import glob
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import signal
 import sys
-import json
-import gzip
+try:
+    # ISA-L's igzip is a drop-in gzip with SIMD deflate/CRC32, several
+    # times faster than stdlib on both compress and decompress.
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
 import bz2
+import lzma
+import io
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+try:
+    from rbloom import Bloom
+except ImportError:
+    Bloom = None
+import tempfile
+import shutil
+import mmap
+import subprocess
+import heapq
+import math
+import contextlib
+import xxhash
 from colorama import init, Fore, Style
 import random
 
@@ -36,7 +61,7 @@ __license__ = "MIT License"
 
 MASTER_FILE = "master_wordlist.txt"
 LOG_FILE = "listman.log"
-RESUME_FILE = "resume_state.json"
+RESUME_FILE = "resume_state.txt"
 
 should_exit = False
 
@@ -102,50 +127,221 @@ def log_action(log_path, action, path, word_count):
     with open(log_path, "a") as logfile:
         logfile.write(f"{datetime.now().isoformat()} | {action:<6} | {path} | {word_count} words\n")
 
-def load_logged_files(log_path):
-    if not log_path or not os.path.exists(log_path):
-        return set()
-    logged = set()
-    with open(log_path, "r") as logfile:
-        for line in logfile:
-            parts = line.strip().split("|")
-            if len(parts) >= 3:
-                path = parts[2].strip()
-                logged.add(path)
-    return logged
-
-def save_resume_state(pending_files):
-    with open(RESUME_FILE, "w") as f:
-        json.dump(pending_files, f)
+class LoggedFiles:
+    """Lazy, mtime-aware view of the processed-files log.
+
+    The log is parsed at most once per change: membership checks reuse
+    the cached set until the file's mtime moves (workers append to the
+    log from their own processes, so mtime is what invalidates here).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._cache = None
+        self._mtime = None
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            self._cache = set()
+            self._mtime = None
+            return
+        mtime = os.path.getmtime(self.path)
+        if self._cache is not None and self._mtime == mtime:
+            return
+        with open(self.path, "rb") as logfile:
+            data = logfile.read()
+        self._cache = set(
+            parts[2].strip().decode("utf-8", "ignore")
+            for parts in (line.split(b"|", 3) for line in data.splitlines())
+            if len(parts) >= 3
+        )
+        self._mtime = mtime
+
+    def __contains__(self, path):
+        self._load()
+        return path in self._cache
+
+    def __len__(self):
+        self._load()
+        return len(self._cache)
+
+SPILL_MARKER = "#spill:"
+
+def save_resume_state(pending_files, spill_paths=()):
+    # One path per line: a single join+write, no JSON escape scanning, so
+    # pausing a huge run with Ctrl+C stays instant. Spills from files that
+    # already finished are recorded as "#spill:" lines so their work is
+    # picked up by --resume instead of being redone (or worse, lost).
+    with open(RESUME_FILE, "wb") as f:
+        lines = list(pending_files) + [SPILL_MARKER + p for p in spill_paths]
+        f.write("\n".join(lines).encode() + b"\n")
     print(f"[+] Saved resume state with {len(pending_files)} pending files.")
 
 def load_resume_state():
-    if os.path.exists(RESUME_FILE):
-        with open(RESUME_FILE, "r") as f:
-            return json.load(f)
-    return None
+    """Return (pending_files, finished_spill_paths), or None if there is
+    no saved state."""
+    if not os.path.exists(RESUME_FILE):
+        return None
+    with open(RESUME_FILE, "rb") as f:
+        lines = [p for p in f.read().decode().splitlines() if p]
+    pending = [p for p in lines if not p.startswith(SPILL_MARKER)]
+    spills = [p[len(SPILL_MARKER):] for p in lines if p.startswith(SPILL_MARKER)]
+    return pending, spills
 
 # -------------------- Word Collection --------------------
+AVG_WORD_LEN = 10  # rough bytes-per-line guess for sizing estimates
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def dedup_capacity_hint(paths):
+    """Estimate how many entries the master will hold.
+
+    Used for the operator-facing estimate; derived from summed input
+    sizes assuming ~10 bytes/line, floored at 4096 for small batches.
+    """
+    total_bytes = sum(file_size(p) for p in paths)
+    return max(total_bytes // AVG_WORD_LEN, 4096)
+
+def spill_words(words):
+    """Write unique words to a temp spill file as sorted newline-terminated
+    lines (the sort key save_master merges on) and return its path."""
+    fd, spill_path = tempfile.mkstemp(prefix="listman_spill_", suffix=".txt")
+    with os.fdopen(fd, "wb") as spill:
+        spill.writelines(sorted(w + b"\n" for w in words))
+    return spill_path
+
+def decompress_input(data):
+    """Transparently decompress gzip/bz2/zstd/xz input, sniffed from the
+    magic bytes; anything else is returned untouched."""
+    if data[:2] == b"\x1f\x8b":
+        return gzip.decompress(data)
+    if data[:3] == b"BZh":
+        return bz2.decompress(data)
+    if data[:4] == b"\x28\xb5\x2f\xfd":
+        if zstandard is None:
+            raise RuntimeError("zstd input needs the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    if data[:6] == b"\xfd7zXZ\x00":
+        return lzma.decompress(data)
+    return data
+
+def spill_file_data(path, data, log_path=None, action=None):
+    """Dedup one file's raw bytes and spill the unique words to disk."""
+    data = decompress_input(data)
+    words = set(data.splitlines())
+    words.discard(b"")
+    spill_path = spill_words(words)
+    if log_path and action and not should_exit:
+        log_action(log_path, action, path, len(words))
+    return spill_path
+
 def collect_words_from_file(path, log_path=None, action=None):
     global should_exit
-    words = set()
+    spill_path = None
     try:
-        with open(path, "r", errors="ignore") as infile:
-            total = sum(1 for _ in infile)
-        with open(path, "r", errors="ignore") as infile:
-            for line in tqdm(infile, total=total, desc=f"Processing {os.path.basename(path)}", leave=False):
-                if should_exit:
-                    break
-                word = line.strip()
-                if word:
-                    words.add(word)
-        if log_path and action and not should_exit:
-            log_action(log_path, action, path, len(words))
+        if should_exit:
+            return spill_path
+        # Read the whole file as bytes in one call and split in C instead of
+        # looping line-by-line in Python. Words stay as bytes end-to-end.
+        with open(path, "rb") as infile:
+            if hasattr(os, "posix_fadvise"):
+                # Widen kernel readahead for the sequential scan and start
+                # prefetching before the read gets there.
+                os.posix_fadvise(infile.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(infile.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            data = infile.read()
+            if hasattr(os, "posix_fadvise"):
+                # Wordlists are read once; drop them from the page cache
+                # instead of evicting more useful pages.
+                os.posix_fadvise(infile.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        spill_path = spill_file_data(path, data, log_path, action)
     except Exception as e:
         print(f"[-] Error reading {path}: {e}")
-    return words
-
-def collect_words_from_inputs(files, folders, threads, log_path=None, action=None, skip_logged=False, resume=False):
+    return spill_path
+
+IO_URING_ENTRIES = 1024  # submission ring depth for --io-uring
+
+def collect_files_io_uring(all_files, progress, log_path=None, action=None, remaining=None):
+    """Ingest files through a shared io_uring (Linux only, needs the
+    liburing bindings). Reads are batched into the ring so thousands of
+    files cost a handful of submit syscalls instead of one read() each;
+    completed buffers are deduped and spilled inline."""
+    import liburing
+    spill_paths = []
+    ring = liburing.Ring()
+    liburing.io_uring_queue_init(IO_URING_ENTRIES, ring)
+    cqe = liburing.Cqe()
+    pending = {}  # user_data -> (path, fd, buffer)
+    next_id = 0
+    queue = list(all_files)
+    try:
+        while (queue or pending) and not should_exit:
+            # Top up the ring with read SQEs into pre-sized buffers.
+            while queue and len(pending) < IO_URING_ENTRIES:
+                path = queue.pop()
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                    buf = bytearray(os.fstat(fd).st_size)
+                except OSError as e:
+                    print(f"[-] Error reading {path}: {e}")
+                    continue
+                sqe = liburing.io_uring_get_sqe(ring)
+                if sqe is None:
+                    os.close(fd)
+                    queue.append(path)
+                    break
+                liburing.io_uring_prep_read(sqe, fd, buf)
+                liburing.io_uring_sqe_set_data64(sqe, next_id)
+                pending[next_id] = (path, fd, buf)
+                next_id += 1
+            liburing.io_uring_submit(ring)
+            if not pending:
+                continue
+            liburing.io_uring_wait_cqe(ring, cqe)
+            ready = liburing.io_uring_cq_ready(ring)
+            for i in range(ready):
+                entry = cqe[i]
+                path, fd, buf = pending.pop(liburing.io_uring_cqe_get_data64(entry))
+                res = entry.res
+                if res < 0:
+                    print(f"[-] Error reading {path}: {os.strerror(-res)}")
+                    os.close(fd)
+                    continue
+                data = bytes(buf[:res])
+                try:
+                    # A single read may come back short on very large files;
+                    # finish it off with pread before closing. Errors here
+                    # are per-file, like the open/submit errors above; only
+                    # ring setup failures propagate to the caller.
+                    while res < len(buf):
+                        chunk = os.pread(fd, len(buf) - res, res)
+                        if not chunk:
+                            break
+                        data += chunk
+                        res += len(chunk)
+                    spill_paths.append(spill_file_data(path, data, log_path, action))
+                except Exception as e:
+                    print(f"[-] Error reading {path}: {e}")
+                finally:
+                    os.close(fd)
+                progress.update(file_size(path))
+                if remaining is not None:
+                    remaining.discard(path)
+            liburing.io_uring_cq_advance(ring, ready)
+    finally:
+        for path, fd, buf in pending.values():
+            os.close(fd)
+        liburing.io_uring_queue_exit(ring)
+    return spill_paths
+
+def collect_words_from_inputs(files, folders, threads, logged=None, action=None, skip_logged=False, resume=False, use_io_uring=False):
+    # Workers only need the raw log path; the LoggedFiles instance stays
+    # in the parent for membership checks.
+    log_path = logged.path if logged is not None else None
     all_files = []
 
     if files:
@@ -158,94 +354,368 @@ def collect_words_from_inputs(files, folders, threads, log_path=None, action=Non
     if folders:
         for folder in folders:
             if os.path.isdir(folder):
-                all_files.extend(glob.glob(os.path.join(folder, "*.txt")))
+                # scandir serves is_file() from the cached dirent, avoiding
+                # glob's pattern matching and per-entry stat calls.
+                with os.scandir(folder) as entries:
+                    all_files.extend(e.path for e in entries if e.is_file() and e.name.endswith(".txt"))
             else:
                 print(f"[-] Folder not found: {folder}")
 
     if not all_files:
-        return set()
+        return []
 
     if skip_logged and log_path:
-        logged = load_logged_files(log_path)
         all_files = [f for f in all_files if f not in logged]
         print(f"[+] Skipping {len(logged)} already logged files. {len(all_files)} left.")
 
+    saved_spills = []
     if resume:
-        pending = load_resume_state()
-        if pending:
-            print(f"[+] Resuming from saved state with {len(pending)} files...")
+        state = load_resume_state()
+        if state is not None:
+            pending, saved_spills = state
+            saved_spills = [p for p in saved_spills if os.path.exists(p)]
+            print(f"[+] Resuming from saved state with {len(pending)} files "
+                  f"and {len(saved_spills)} finished spills...")
             all_files = pending
 
-    words = set()
-    print(f"[+] Processing {len(all_files)} file(s) with {threads} thread(s)...")
-    remaining = list(all_files)
-
+    # Spills carried over from a paused run count as already-collected.
+    spill_paths = list(saved_spills)
+    estimate = dedup_capacity_hint(all_files)
+    print(f"[+] Processing {len(all_files)} file(s) with {threads} thread(s) (~{estimate} entries estimated)...")
+    # Submit the largest files first for better load balance across workers.
+    all_files.sort(key=file_size, reverse=True)
+    # Files still awaiting processing; completed ones are discarded inline
+    # so an interrupted run can save its resume state without consulting
+    # the log again.
+    remaining = set(all_files)
+
+    total_bytes = sum(file_size(f) for f in all_files)
     try:
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            futures = {executor.submit(collect_words_from_file, f, log_path, action): f for f in all_files}
-            for future in tqdm(as_completed(futures), total=len(futures), desc="Merging results"):
-                if should_exit:
-                    break
-                words |= future.result()
+        # Progress advances by input bytes per finished file, not per
+        # line, so tqdm is updated O(#files) times instead of O(#lines).
+        if use_io_uring:
+            try:
+                with tqdm(total=total_bytes, unit="B", unit_scale=True, desc="Collecting results") as progress:
+                    spill_paths += collect_files_io_uring(all_files, progress, log_path, action, remaining)
+            except ImportError:
+                print("[-] liburing bindings not available, using process pool instead")
+                use_io_uring = False
+            except OSError as e:
+                # io_uring is often unavailable even where liburing imports:
+                # Docker's default seccomp profile rejects the syscalls with
+                # EPERM, older kernels with ENOSYS.
+                print(f"[-] io_uring setup failed ({e}), using process pool instead")
+                use_io_uring = False
+        if not use_io_uring:
+            with ProcessPoolExecutor(max_workers=threads) as executor:
+                futures = {executor.submit(collect_words_from_file, f, log_path, action): f for f in all_files}
+                with tqdm(total=total_bytes, unit="B", unit_scale=True, desc="Collecting results") as progress:
+                    for future in as_completed(futures):
+                        if should_exit:
+                            # Workers are separate processes and never see
+                            # should_exit, so cancel the queued files here;
+                            # otherwise the with-block's shutdown(wait=True)
+                            # would run every pending file before "pausing"
+                            # when only the parent received the signal.
+                            # wait=True matters: the with-block exit calls
+                            # shutdown() again and would overwrite the
+                            # cancel_futures flag before the pool's manager
+                            # thread acted on it.
+                            executor.shutdown(wait=True, cancel_futures=True)
+                            # Files that finished after the last loop
+                            # iteration still wrote spills; sweep their
+                            # results up so they are recorded in the resume
+                            # state below rather than orphaned in /tmp.
+                            for done_future in futures:
+                                if done_future.done() and not done_future.cancelled():
+                                    try:
+                                        spill_path = done_future.result()
+                                    except Exception:
+                                        continue
+                                    remaining.discard(futures[done_future])
+                                    if spill_path and spill_path not in spill_paths:
+                                        spill_paths.append(spill_path)
+                            break
+                        spill_path = future.result()
+                        progress.update(file_size(futures[future]))
+                        remaining.discard(futures[future])
+                        if spill_path:
+                            spill_paths.append(spill_path)
     except KeyboardInterrupt:
         pass
 
     if should_exit:
-        unfinished = [f for f in remaining if f not in load_logged_files(log_path)]
-        save_resume_state(unfinished)
+        unfinished = [f for f in all_files if f in remaining]
+        # Finished files' words exist only in their spills until
+        # save_master() runs, so the spills are kept and recorded in the
+        # state; deleting them here would silently lose those files.
+        save_resume_state(unfinished, spill_paths)
         sys.exit(0)
 
     if os.path.exists(RESUME_FILE):
+        if not resume:
+            # A fresh run completing over a stale pause makes the old
+            # state moot; drop its recorded spills along with it.
+            state = load_resume_state()
+            if state is not None:
+                remove_spills(state[1])
         os.remove(RESUME_FILE)
 
-    return words
+    return spill_paths
 
 # -------------------- Save Master --------------------
-def save_master(words, compress=None):
+def remove_spills(spill_paths):
+    for spill_path in spill_paths:
+        try:
+            os.remove(spill_path)
+        except OSError:
+            pass
+
+WRITE_BUFFER_SIZE = 256 * 1024  # flush threshold for compressed writes
+
+def write_master_words_unsorted(outfile, spill_paths):
+    # Fused dedup+write: stream the spills in arrival order and emit each
+    # word the first time its 64-bit xxh3 digest is seen. Only digests
+    # (~16 B/entry) stay in RAM and there is no final sort stall.
+    seen = set()
+    count = 0
+    buf = bytearray()
+    for spill_path in tqdm(spill_paths, desc="Writing master"):
+        with open(spill_path, "rb") as spill:
+            for word in spill.read().splitlines():
+                h = xxhash.xxh3_64_intdigest(word)
+                if h not in seen:
+                    seen.add(h)
+                    count += 1
+                    buf += word
+                    buf += b"\n"
+                    if len(buf) >= WRITE_BUFFER_SIZE:
+                        outfile.write(buf)
+                        buf.clear()
+    if buf:
+        outfile.write(buf)
+    return count
+
+def write_master_words(outfile, spill_paths):
+    # K-way merge of the sorted spill files. Duplicates across files come
+    # out adjacent in the merged stream, so a one-line lookback dedups with
+    # O(#files) memory instead of a global in-RAM set. Lines are batched
+    # into a buffer so the compressor (and its CRC update) sees a few large
+    # writes instead of one tiny write per word. Returns the unique count.
+    count = 0
+    buf = bytearray()
+    prev = None
+    with contextlib.ExitStack() as stack:
+        streams = [stack.enter_context(open(p, "rb")) for p in spill_paths]
+        for line in heapq.merge(*streams):
+            if line != prev:
+                prev = line
+                count += 1
+                buf += line
+                if len(buf) >= WRITE_BUFFER_SIZE:
+                    outfile.write(buf)
+                    buf.clear()
+    if buf:
+        outfile.write(buf)
+    return count
+
+def open_master_output(compress, out_file, threads, compresslevel=1):
+    # Prefer a parallel external compressor (pigz/pbzip2) that deflates
+    # across cores; fall back to the in-process module when absent.
+    # Returns (writable file object, subprocess or None).
     if compress == "gzip":
-        out_file = MASTER_FILE + ".gz"
-        print(f"[+] Saving compressed master wordlist (gzip) with {len(words)} entries...")
-        with gzip.open(out_file, "wt") as outfile:
-            for word in tqdm(sorted(words), desc="Writing master"):
-                outfile.write(word + "\n")
-    elif compress == "bz2":
-        out_file = MASTER_FILE + ".bz2"
-        print(f"[+] Saving compressed master wordlist (bz2) with {len(words)} entries...")
-        with bz2.open(out_file, "wt") as outfile:
-            for word in tqdm(sorted(words), desc="Writing master"):
-                outfile.write(word + "\n")
+        binary = shutil.which("pigz")
+        if binary:
+            with open(out_file, "wb") as raw:
+                proc = subprocess.Popen([binary, f"-{compresslevel}", "-p", str(threads)], stdin=subprocess.PIPE, stdout=raw)
+            return proc.stdin, proc
+        # isal's igzip only accepts levels 0-3; clamp when it is in use.
+        level = min(compresslevel, gzip._COMPRESS_LEVEL_BEST)
+        return gzip.open(out_file, "wb", compresslevel=level), None
+    if compress == "bz2":
+        binary = shutil.which("pbzip2")
+        if binary:
+            with open(out_file, "wb") as raw:
+                proc = subprocess.Popen([binary, f"-{compresslevel}", f"-p{threads}"], stdin=subprocess.PIPE, stdout=raw)
+            return proc.stdin, proc
+        return bz2.open(out_file, "wb", compresslevel=compresslevel), None
+    if compress == "zstd":
+        # threads=-1 spreads compression over all cores in-library,
+        # no external binary needed.
+        cctx = zstandard.ZstdCompressor(level=compresslevel, threads=-1)
+        return cctx.stream_writer(open(out_file, "wb")), None
+    if compress == "lz4":
+        return lz4.frame.open(out_file, "wb", compression_level=compresslevel), None
+    return open(out_file, "wb"), None
+
+MASTER_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "zstd": ".zst", "lz4": ".lz4"}
+
+def save_master(spill_paths, compress=None, threads=1, compresslevel=1, sorted_output=False):
+    if compress:
+        out_file = MASTER_FILE + MASTER_SUFFIXES[compress]
+        print(f"[+] Saving compressed master wordlist ({compress}) from {len(spill_paths)} spill file(s)...")
     else:
         out_file = MASTER_FILE
-        print(f"[+] Saving master wordlist with {len(words)} entries...")
-        with open(out_file, "w") as outfile:
-            for word in tqdm(sorted(words), desc="Writing master"):
-                outfile.write(word + "\n")
-    print(f"[+] Done: {out_file}")
+        print(f"[+] Saving master wordlist from {len(spill_paths)} spill file(s)...")
+    outfile, proc = open_master_output(compress, out_file, threads, compresslevel)
+    try:
+        if sorted_output:
+            count = write_master_words(outfile, spill_paths)
+        else:
+            count = write_master_words_unsorted(outfile, spill_paths)
+    finally:
+        outfile.close()
+        if proc and proc.wait() != 0:
+            print(f"[-] Compressor exited with status {proc.returncode}")
+    remove_spills(spill_paths)
+    print(f"[+] Done: {out_file} ({count} unique entries)")
+
+# -------------------- Bloom Filter (add fast path) --------------------
+BLOOM_SIDECAR = MASTER_FILE + ".bloom"
+BLOOM_FPR = 0.01
+
+def bloom_hash(word):
+    # rbloom persists filters, so it needs a hash that is stable across
+    # processes (bytes.__hash__ is salted); xxh3_128 shifted into i128.
+    return xxhash.xxh3_128_intdigest(word) - (1 << 127)
+
+def bloom_capacity(bloom):
+    # Invert the standard m = -n*ln(p)/ln(2)^2 sizing formula to recover
+    # how many items a loaded sidecar filter was built for.
+    return int(bloom.size_in_bits * math.log(2) ** 2 / math.log(1 / BLOOM_FPR))
+
+def load_master_bloom(master_path, incoming_hint=0):
+    """Bloom filter over the master's words, cached in a sidecar file.
+
+    Rebuilt whenever the master is newer than the sidecar, or the filter
+    no longer has headroom for the incoming batch: appends keep filling
+    a filter sized only for the original master, and an overloaded
+    filter's false-positive rate climbs far past BLOOM_FPR.
+    """
+    if os.path.exists(BLOOM_SIDECAR) and os.path.getmtime(BLOOM_SIDECAR) >= os.path.getmtime(master_path):
+        try:
+            bloom = Bloom.load(BLOOM_SIDECAR, bloom_hash)
+            if bloom.approx_items + incoming_hint <= bloom_capacity(bloom):
+                return bloom
+        except Exception:
+            pass  # corrupt/foreign sidecar: rebuild below
+    bloom = Bloom(dedup_capacity_hint([master_path]) + incoming_hint, BLOOM_FPR, bloom_hash)
+    with open(master_path, "rb") as infile:
+        for line in infile:
+            bloom.add(line.rstrip(b"\r\n"))
+    return bloom
+
+def append_new_words(spill_paths, bloom):
+    # Append-only add: words the filter has never seen are definitely new
+    # and go straight onto the end of the master. A filter hit only means
+    # "probably known", so hits are held back and settled with one
+    # streaming pass over the master below — a false positive may cost
+    # the exact check, never a real word.
+    count = 0
+    buf = bytearray()
+    maybe_known = {}  # filter hits in first-seen order, pending exact check
+    with open(MASTER_FILE, "ab") as outfile:
+        for spill_path in tqdm(spill_paths, desc="Appending to master"):
+            with open(spill_path, "rb") as spill:
+                for word in spill.read().splitlines():
+                    if word in bloom:
+                        maybe_known[word] = None
+                        continue
+                    bloom.add(word)
+                    count += 1
+                    buf += word
+                    buf += b"\n"
+                    if len(buf) >= WRITE_BUFFER_SIZE:
+                        outfile.write(buf)
+                        buf.clear()
+        if buf:
+            outfile.write(buf)
+            buf.clear()
+        outfile.flush()
+        if maybe_known:
+            # One sequential read settles every hit. Words appended above
+            # are already on disk, so duplicates re-seen within this batch
+            # drop out here as well.
+            with open(MASTER_FILE, "rb") as infile:
+                for line in infile:
+                    maybe_known.pop(line.rstrip(b"\r\n"), None)
+                    if not maybe_known:
+                        break
+            for word in maybe_known:
+                count += 1
+                buf += word
+                buf += b"\n"
+                if len(buf) >= WRITE_BUFFER_SIZE:
+                    outfile.write(buf)
+                    buf.clear()
+            if buf:
+                outfile.write(buf)
+    remove_spills(spill_paths)
+    # Saved after the master write, so the sidecar's mtime stays >= the
+    # master's and the next add can reuse it.
+    bloom.save(BLOOM_SIDECAR)
+    print(f"[+] Done: {MASTER_FILE} ({count} new entries appended)")
 
 # -------------------- Create / Add --------------------
-def create_master(files, folders, threads, log_path, skip_logged, resume, compress):
-    words = collect_words_from_inputs(files, folders, threads, log_path, "CREATE", skip_logged, resume)
-    save_master(words, compress)
+def create_master(files, folders, threads, logged, skip_logged, resume, compress, use_io_uring=False, compresslevel=1, sorted_output=False):
+    spill_paths = collect_words_from_inputs(files, folders, threads, logged, "CREATE", skip_logged, resume, use_io_uring)
+    save_master(spill_paths, compress, threads, compresslevel, sorted_output)
 
-def add_to_master(files, folders, threads, log_path, skip_logged, resume, compress):
-    if not any(os.path.exists(f) for f in [MASTER_FILE, MASTER_FILE + ".gz", MASTER_FILE + ".bz2"]):
+def add_to_master(files, folders, threads, logged, skip_logged, resume, compress, use_io_uring=False, compresslevel=1, sorted_output=False):
+    master_variants = [MASTER_FILE] + [MASTER_FILE + s for s in MASTER_SUFFIXES.values()]
+    if not any(os.path.exists(f) for f in master_variants):
         print("[-] No master wordlist found. Use --create first.")
         return
 
+    # Fast path: with rbloom installed and a plain-text unsorted master,
+    # prefilter candidates through a Bloom filter and append only the new
+    # words, instead of loading and rewriting the whole master.
+    if Bloom is not None and compress is None and not sorted_output and os.path.exists(MASTER_FILE):
+        print("[+] Using Bloom filter fast path for add")
+        spill_paths = collect_words_from_inputs(files, folders, threads, logged, "ADD", skip_logged, resume, use_io_uring)
+        # Collect first: the spill sizes tell load_master_bloom how much
+        # headroom this batch needs before it trusts the cached sidecar.
+        bloom = load_master_bloom(MASTER_FILE, dedup_capacity_hint(spill_paths))
+        append_new_words(spill_paths, bloom)
+        return
+
     existing = set()
     if os.path.exists(MASTER_FILE):
-        with open(MASTER_FILE, "r", errors="ignore") as infile:
-            existing = set(line.strip() for line in infile if line.strip())
+        # Map the master instead of read(): mmap.readline does its memchr
+        # scan straight over the page cache, so no full-file heap copy is
+        # ever made, only the per-line bytes that land in the set.
+        with open(MASTER_FILE, "rb") as infile:
+            if file_size(MASTER_FILE) > 0:
+                with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    existing = set(line.rstrip(b"\r\n") for line in iter(mm.readline, b""))
     elif os.path.exists(MASTER_FILE + ".gz"):
-        with gzip.open(MASTER_FILE + ".gz", "rt") as infile:
-            existing = set(line.strip() for line in infile if line.strip())
+        with gzip.open(MASTER_FILE + ".gz", "rb") as infile:
+            existing = set(infile.read().splitlines())
     elif os.path.exists(MASTER_FILE + ".bz2"):
-        with bz2.open(MASTER_FILE + ".bz2", "rt") as infile:
-            existing = set(line.strip() for line in infile if line.strip())
+        with bz2.open(MASTER_FILE + ".bz2", "rb") as infile:
+            existing = set(infile.read().splitlines())
+    elif os.path.exists(MASTER_FILE + ".zst"):
+        with open(MASTER_FILE + ".zst", "rb") as infile:
+            existing = set(zstandard.ZstdDecompressor().stream_reader(infile).read().splitlines())
+    elif os.path.exists(MASTER_FILE + ".lz4"):
+        with lz4.frame.open(MASTER_FILE + ".lz4", "rb") as infile:
+            existing = set(infile.read().splitlines())
+    existing.discard(b"")
 
     print(f"[+] Loaded {len(existing)} entries from existing master")
-    words = existing | collect_words_from_inputs(files, folders, threads, log_path, "ADD", skip_logged, resume)
-    save_master(words, compress)
+    # The existing master becomes one more sorted spill in the merge.
+    existing_spill = spill_words(existing)
+    del existing
+    try:
+        spill_paths = collect_words_from_inputs(files, folders, threads, logged, "ADD", skip_logged, resume, use_io_uring)
+    except SystemExit:
+        # A pause during collection exits before save_master() runs, which
+        # would leave the /tmp copy of the whole master behind.
+        remove_spills([existing_spill])
+        raise
+    # Existing master first: its words are emitted before any new ones
+    # in the default first-seen order.
+    save_master([existing_spill] + spill_paths, compress, threads, compresslevel, sorted_output)
 
 # -------------------- Main --------------------
 def main():
@@ -259,7 +729,12 @@ def main():
     parser.add_argument("--log-file", default=LOG_FILE, help="Path to log file (default: listman.log)")
     parser.add_argument("--skip-logged", action="store_true", help="Skip files already in log")
     parser.add_argument("--resume", action="store_true", help="Resume from last interrupted state")
-    parser.add_argument("--compress", choices=["gzip", "bz2"], help="Compress the master list (gzip or bz2)")
+    parser.add_argument("--io-uring", action="store_true", help="Read input files through io_uring (Linux, needs liburing)")
+    parser.add_argument("--compress", choices=["gzip", "bz2", "zstd", "lz4"], help="Compress the master list (gzip, bz2, zstd or lz4)")
+    parser.add_argument("--compresslevel", type=int, default=1, choices=range(1, 10), metavar="1-9",
+                        help="Compression level for --compress (default: 1, fastest)")
+    parser.add_argument("--sorted", action="store_true",
+                        help="Write the master sorted (slower; default is first-seen order)")
     parser.add_argument("--version", action="store_true", help="Show version info and exit")
     parser.add_argument("--about", action="store_true", help="Show about banner and exit")
 
@@ -273,12 +748,19 @@ def main():
         print(banner())
         sys.exit(0)
 
-    log_path = args.log_file if args.log else None
+    if args.compress == "zstd" and zstandard is None:
+        print("[-] --compress zstd needs the 'zstandard' package")
+        sys.exit(1)
+    if args.compress == "lz4" and lz4 is None:
+        print("[-] --compress lz4 needs the 'lz4' package")
+        sys.exit(1)
+
+    logged = LoggedFiles(args.log_file if args.log else None)
 
     if args.create or args.create_folder:
-        create_master(args.create, args.create_folder, args.threads, log_path, args.skip_logged, args.resume, args.compress)
+        create_master(args.create, args.create_folder, args.threads, logged, args.skip_logged, args.resume, args.compress, args.io_uring, args.compresslevel, args.sorted)
     elif args.add or args.add_folder:
-        add_to_master(args.add, args.add_folder, args.threads, log_path, args.skip_logged, args.resume, args.compress)
+        add_to_master(args.add, args.add_folder, args.threads, logged, args.skip_logged, args.resume, args.compress, args.io_uring, args.compresslevel, args.sorted)
     else:
         print("[-] No action specified. Use --create / --add or --*-folder.")
 